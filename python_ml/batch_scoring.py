@@ -0,0 +1,268 @@
+"""
+Bulk Offline Scoring for Kenyan Agriculture
+Streams farm records through the yield, disease risk and image models
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from crop_yield_predictor import KenyanCropYieldPredictor
+
+LIST_COLUMNS = ['pesticides', 'diseases']
+DETECTION_COLUMNS = ['detected_disease', 'detection_confidence', 'severity', 'treatment',
+                     'detection_error']
+
+# Disease detector loaded once per worker process by _init_detector
+_detector = None
+
+def _init_detector(model_path):
+    """
+    Load the image model in a worker process
+    """
+    global _detector
+    # TensorFlow is only needed when records list photos
+    from disease_detection import PlantDiseaseDetector
+
+    _detector = PlantDiseaseDetector()
+    _detector.load_model(model_path)
+
+def _detect_batch(image_paths):
+    """
+    Run batched disease detection (runs in a worker process)
+    """
+    return _detector.predict_disease_batch(image_paths)
+
+def _parse_list(value):
+    """
+    Turn a pesticides/diseases cell from CSV or Parquet into a list
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            return list(ast.literal_eval(value))
+        return [item.strip() for item in value.split(';') if item.strip()]
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    return list(value)
+
+def iter_records(input_path, chunk_size, skip_rows=0):
+    """
+    Stream farm records from a CSV or Parquet file in chunks, skipping rows
+    already scored by an earlier run
+    """
+    if input_path.endswith('.parquet'):
+        # Optional dependency, only needed for Parquet input
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            yield batch.slice(skip_rows).to_pandas()
+            skip_rows = 0
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size,
+                               skiprows=range(1, skip_rows + 1))
+
+def load_checkpoint(checkpoint_path, input_path):
+    """
+    Progress of an earlier run over the same input, if any
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, 'r') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('input') != os.path.abspath(input_path):
+        return None
+    return checkpoint
+
+def output_matches_checkpoint(output_path, checkpoint, to_parquet):
+    """
+    Whether the output written so far is still intact for a resume
+    """
+    if to_parquet:
+        return all(
+            os.path.exists(os.path.join(output_path, f'part-{i:05d}.parquet'))
+            for i in range(checkpoint['chunks_done'])
+        )
+    if not os.path.exists(output_path):
+        return checkpoint['output_bytes'] == 0
+    return os.path.getsize(output_path) >= checkpoint['output_bytes']
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    """
+    Atomically replace the checkpoint file
+    """
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+def score_chunk(predictor, chunk, pool=None, photo_column='photo_path', photo_batch_size=32):
+    """
+    Score one chunk of farm records with the yield, risk and image models
+    """
+    for column in LIST_COLUMNS:
+        if column in chunk:
+            chunk[column] = chunk[column].map(_parse_list)
+
+    # Submit photos first so image inference overlaps with tabular scoring
+    photo_futures = []
+    if pool is not None and photo_column in chunk:
+        has_photo = chunk[photo_column].notna() & (chunk[photo_column].astype(str) != '')
+        photo_index = chunk.index[has_photo]
+        photo_paths = chunk.loc[has_photo, photo_column].astype(str).tolist()
+        for start in range(0, len(photo_paths), photo_batch_size):
+            photo_futures.append((
+                photo_index[start:start + photo_batch_size],
+                pool.submit(_detect_batch, photo_paths[start:start + photo_batch_size])
+            ))
+
+    yield_results = predictor.predict_yield_batch(chunk).rename(
+        columns={'confidence': 'yield_confidence'}
+    )
+    risk_results = predictor.predict_disease_risk_batch(chunk).rename(
+        columns={'confidence': 'risk_confidence'}
+    )
+    scored = pd.concat([chunk, yield_results, risk_results], axis=1)
+
+    if pool is not None:
+        # Every chunk gets the detection columns, even one without photos
+        detections = pd.DataFrame(index=scored.index, columns=DETECTION_COLUMNS, dtype=object)
+        for index, future in photo_futures:
+            detections.loc[index] = [
+                [result['disease'], result['confidence'], result['severity'],
+                 '; '.join(result['treatment']), result.get('error')]
+                for result in future.result()
+            ]
+        scored = pd.concat([scored, detections], axis=1)
+
+    return scored
+
+def run_batch_scoring(input_path, output_path, model_path, detector_model_path=None,
+                      chunk_size=50_000, workers=2, photo_column='photo_path',
+                      photo_batch_size=32, restart=False):
+    """
+    Score every record of input_path, writing results incrementally to
+    output_path (.csv file, or .parquet directory of part files). Progress is
+    checkpointed after each chunk so an interrupted run resumes where it
+    stopped.
+    """
+    to_parquet = output_path.endswith('.parquet')
+    checkpoint_path = output_path.rstrip('/') + '.checkpoint.json'
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, input_path)
+
+    # Never mix results from two models in one output
+    if checkpoint and checkpoint.get('model') != os.path.abspath(model_path):
+        raise ValueError(f"{output_path} was scored with model {checkpoint.get('model')}; "
+                         "use --restart to score again with this model")
+
+    if checkpoint and not output_matches_checkpoint(output_path, checkpoint, to_parquet):
+        print(f"{output_path} is missing or shorter than the checkpoint; starting over")
+        checkpoint = None
+
+    if checkpoint and checkpoint.get('completed'):
+        print(f"{output_path} is already complete ({checkpoint['rows_done']} rows); "
+              "use --restart to score again")
+        return checkpoint
+
+    if checkpoint:
+        print(f"Resuming after {checkpoint['rows_done']} rows")
+    else:
+        checkpoint = {'input': os.path.abspath(input_path),
+                      'model': os.path.abspath(model_path),
+                      'rows_done': 0, 'chunks_done': 0, 'output_bytes': 0}
+
+    # Drop output written after the last checkpoint (or by an earlier run)
+    if to_parquet:
+        os.makedirs(output_path, exist_ok=True)
+        for part in glob.glob(os.path.join(output_path, 'part-*.parquet')):
+            if int(os.path.basename(part)[5:10]) >= checkpoint['chunks_done']:
+                os.remove(part)
+    else:
+        with open(output_path, 'a') as f:
+            f.truncate(checkpoint['output_bytes'])
+
+    predictor = KenyanCropYieldPredictor()
+    predictor.load_model(model_path)
+
+    pool = None
+    if detector_model_path:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_detector,
+                                   initargs=(detector_model_path,))
+
+    start_time = time.perf_counter()
+    rows_this_run = 0
+    try:
+        for chunk in iter_records(input_path, chunk_size, checkpoint['rows_done']):
+            chunk.index = pd.RangeIndex(checkpoint['rows_done'],
+                                        checkpoint['rows_done'] + len(chunk))
+            scored = score_chunk(predictor, chunk, pool, photo_column, photo_batch_size)
+
+            if to_parquet:
+                scored.to_parquet(os.path.join(
+                    output_path, f"part-{checkpoint['chunks_done']:05d}.parquet"
+                ), index=False)
+            else:
+                with open(output_path, 'a') as f:
+                    scored.to_csv(f, header=checkpoint['rows_done'] == 0, index=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    checkpoint['output_bytes'] = f.tell()
+
+            checkpoint['rows_done'] += len(scored)
+            checkpoint['chunks_done'] += 1
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            rows_this_run += len(scored)
+            elapsed = time.perf_counter() - start_time
+            print(f"Scored {checkpoint['rows_done']} rows "
+                  f"({rows_this_run / elapsed:.0f} rows/sec)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start_time
+    checkpoint['completed'] = True
+    checkpoint['rows_per_sec'] = rows_this_run / elapsed if elapsed > 0 else 0.0
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    print(f"Finished: {checkpoint['rows_done']} rows written to {output_path} "
+          f"({checkpoint['rows_per_sec']:.0f} rows/sec)")
+    return checkpoint
+
+def main():
+    """
+    Command-line entry point for bulk offline scoring
+    """
+    parser = argparse.ArgumentParser(description="Score farm records in bulk")
+    parser.add_argument('input', help="Farm records (.csv or .parquet)")
+    parser.add_argument('output', help="Results (.csv file or .parquet directory)")
+    parser.add_argument('--model', required=True,
+                        help="Trained KenyanCropYieldPredictor (.joblib)")
+    parser.add_argument('--detector-model', default=None,
+                        help="Trained PlantDiseaseDetector (.h5) for records with photos")
+    parser.add_argument('--chunk-size', type=int, default=50_000,
+                        help="Records per chunk")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Worker processes for disease detection")
+    parser.add_argument('--photo-column', default='photo_path',
+                        help="Column holding plant photo paths")
+    parser.add_argument('--photo-batch-size', type=int, default=32,
+                        help="Photos per disease detection batch")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore any checkpoint and score from the start")
+    args = parser.parse_args()
+
+    run_batch_scoring(args.input, args.output, args.model, args.detector_model,
+                      args.chunk_size, args.workers, args.photo_column,
+                      args.photo_batch_size, args.restart)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark and Profiling Suite for the Crop Yield Pipeline
+Times each pipeline stage across data sizes and n_jobs settings
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+import numpy as np
+import pandas as pd
+
+from crop_yield_predictor import KenyanCropYieldPredictor, iter_kenyan_data_chunks
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_N_JOBS = [1, -1]
+
+def current_rss():
+    """
+    Resident set size of this process in bytes, or None if unavailable
+    """
+    try:
+        # Optional dependency, used when installed
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+class RSSSampler:
+    """
+    Samples process RSS on a background thread to find the peak during a
+    stage, including native allocations (e.g. sklearn trees) that
+    tracemalloc does not see
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        if self.start_rss is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start_rss is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+def run_stage(name, func, profile_dir=None, tag=''):
+    """
+    Run one stage, measuring wall time, peak process RSS and (when
+    tracemalloc is running) the peak Python heap, optionally under
+    cProfile; returns (result, metrics)
+    """
+    profiler = cProfile.Profile() if profile_dir else None
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    # Silence the pipeline's own progress output
+    with redirect_stdout(io.StringIO()), RSSSampler() as rss:
+        if profiler:
+            result = profiler.runcall(func)
+        else:
+            result = func()
+
+    wall_time = time.perf_counter() - start
+    heap_peak = tracemalloc.get_traced_memory()[1] - start_memory if tracing else None
+
+    if profiler:
+        profiler.dump_stats(os.path.join(profile_dir, f'{name}{tag}.prof'))
+
+    measured_rss = rss.start_rss is not None
+    return result, {
+        'stage': name,
+        'wall_time_s': wall_time,
+        'peak_rss_mb': rss.peak_rss / 2 ** 20 if measured_rss else None,
+        'rss_increase_mb': (rss.peak_rss - rss.start_rss) / 2 ** 20 if measured_rss else None,
+        # Python allocations only; native (NumPy/sklearn C) memory is in RSS
+        'python_heap_peak_mb': heap_peak / 2 ** 20 if tracing else None
+    }
+
+@contextmanager
+def untraced():
+    """
+    Pause tracemalloc (if running) so timings are free of tracing overhead
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.stop()
+    try:
+        yield
+    finally:
+        if tracing:
+            tracemalloc.start()
+
+def latency_percentiles(func, records):
+    """
+    Call func once per record and summarise per-call latency in ms
+    """
+    latencies = []
+    for record in records:
+        start = time.perf_counter()
+        func(record)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        'calls': len(latencies),
+        'latency_p50_ms': p50,
+        'latency_p90_ms': p90,
+        'latency_p99_ms': p99
+    }
+
+def benchmark_pipeline(n_samples, n_jobs=1, n_calls=200, profile_dir=None, seed=42):
+    """
+    Benchmark every pipeline stage for one data size and n_jobs setting
+    """
+    data = pd.concat(iter_kenyan_data_chunks(n_samples, seed=seed), ignore_index=True)
+    predictor = KenyanCropYieldPredictor(yield_params={'n_jobs': n_jobs})
+    tag = f'_{n_samples}_jobs{n_jobs}'
+
+    stages = []
+
+    def stage(name, func):
+        result, metrics = run_stage(name, func, profile_dir, tag)
+        stages.append(metrics)
+        return result
+
+    stage('prepare_features', lambda: predictor.prepare_features(data))
+    stage('train_yield_model', lambda: predictor.train_yield_model(data))
+    stage('train_disease_model', lambda: predictor.train_disease_model(data))
+
+    records = data.sample(min(n_calls, len(data)), random_state=seed).to_dict('records')
+    for name, predict in (('predict_yield', predictor.predict_yield),
+                          ('predict_disease_risk', predictor.predict_disease_risk)):
+        stage(name, lambda: [predict(record) for record in records])
+        # Percentiles come from a second pass without tracemalloc, cProfile
+        # or RSS sampling, which inflate per-call latency several times
+        with untraced(), redirect_stdout(io.StringIO()):
+            stages[-1].update(latency_percentiles(predict, records))
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_path = os.path.join(model_dir, 'benchmark_model.joblib')
+        stage('save_model', lambda: predictor.save_model(model_path))
+        stages[-1]['model_size_mb'] = os.path.getsize(model_path) / 2 ** 20
+        stage('load_model', lambda: KenyanCropYieldPredictor().load_model(model_path))
+
+    for metrics in stages:
+        metrics.update({'n_samples': n_samples, 'n_jobs': n_jobs})
+    return stages
+
+def run_benchmarks(sizes=None, n_jobs_settings=None, n_calls=200, profile_dir=None,
+                   output_path='benchmark_results.json', trace_memory=True):
+    """
+    Run benchmark_pipeline over all sizes and n_jobs settings and write the
+    results to a JSON file. Python heap tracing slows Python-heavy stages,
+    so disable it for clean wall-time comparisons.
+    """
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    results = []
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for n_samples in sizes or DEFAULT_SIZES:
+            for n_jobs in n_jobs_settings or DEFAULT_N_JOBS:
+                print(f"Benchmarking {n_samples} rows with n_jobs={n_jobs}...")
+                stages = benchmark_pipeline(n_samples, n_jobs, n_calls, profile_dir)
+                for metrics in stages:
+                    rss, heap = metrics['rss_increase_mb'], metrics['python_heap_peak_mb']
+                    print(f"  {metrics['stage']:<22} {metrics['wall_time_s']:>10.3f} s"
+                          + (f" {rss:>10.1f} MB RSS" if rss is not None else '')
+                          + (f" {heap:>10.1f} MB heap" if heap is not None else ''))
+                results.extend(stages)
+
+                # Write after every configuration so partial runs are kept
+                with open(output_path, 'w') as f:
+                    json.dump(results, f, indent=2)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    print(f"Benchmark results written to {output_path}")
+    return pd.DataFrame(results)
+
+def main():
+    """
+    Command-line entry point for the benchmark suite
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the crop yield pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Numbers of generated rows to benchmark")
+    parser.add_argument('--n-jobs', type=int, nargs='+', default=DEFAULT_N_JOBS,
+                        help="n_jobs settings for the yield forest")
+    parser.add_argument('--calls', type=int, default=200,
+                        help="Single-record calls used for latency percentiles")
+    parser.add_argument('--profile-dir', default=None,
+                        help="Write a cProfile dump per stage to this directory")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="JSON file for the results")
+    parser.add_argument('--no-trace-memory', action='store_true',
+                        help="Skip Python heap tracing for lower timing overhead")
+    args = parser.parse_args()
+
+    run_benchmarks(args.sizes, args.n_jobs, args.calls, args.profile_dir, args.output,
+                   trace_memory=not args.no_trace_memory)
+
+if __name__ == "__main__":
+    main()
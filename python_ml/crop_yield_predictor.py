@@ -9,56 +9,103 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
+from sklearn.base import clone
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, accuracy_score, r2_score
+from sklearn.model_selection import ParameterGrid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import joblib
 import datetime
+import json
+import os
+import pickle
+import tempfile
+import time
+
+DEFAULT_YIELD_PARAMS = {'n_estimators': 100, 'random_state': 42}
+DEFAULT_DISEASE_PARAMS = {'random_state': 42}
+
+# Default search spaces for search_hyperparameters
+YIELD_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 10, 20],
+    'min_samples_leaf': [1, 5]
+}
+DISEASE_PARAM_GRID = {
+    'max_depth': [None, 5, 10],
+    'min_samples_leaf': [1, 5, 20]
+}
+
+# Columns of prepare_features perturbed by simulate_yield_scenarios, with
+# (lower, upper) bounds and the baseline noise std for input uncertainty
+SCENARIO_FEATURES = {
+    'rainfall': (0, (0, None), 100.0),
+    'temperature': (1, (None, None), 1.0),
+    'soil_ph': (2, (4, 9), 0.2),
+    'humidity': (3, (0, 100), 5.0),
+    'soil_nitrogen': (4, (0, None), 3.0),
+    'soil_phosphorus': (5, (0, None), 3.0),
+    'soil_potassium': (6, (0, None), 15.0)
+}
+
+# Named what-if scenarios: per-feature scale, shift and extra noise std
+YIELD_SCENARIOS = {
+    'baseline': {},
+    'failed_long_rains': {'rainfall': {'scale': 0.5, 'std': 150.0}, 'temperature': {'shift': 1.5}},
+    'heat_stress': {'temperature': {'shift': 3.0, 'std': 1.5}, 'humidity': {'shift': -10.0}},
+    'wet_season': {'rainfall': {'scale': 1.4, 'std': 200.0}, 'humidity': {'shift': 10.0}}
+}
 
 class KenyanCropYieldPredictor:
     """
     Supervised ML model for predicting crop yields in Kenya
     """
     
-    def __init__(self):
+    def __init__(self, yield_params=None, disease_params=None):
         self.scaler = StandardScaler()
-        self.yield_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.disease_model = DecisionTreeClassifier(random_state=42)
+        self.yield_model = RandomForestRegressor(
+            **{**DEFAULT_YIELD_PARAMS, **(yield_params or {})}
+        )
+        self.disease_model = DecisionTreeClassifier(
+            **{**DEFAULT_DISEASE_PARAMS, **(disease_params or {})}
+        )
         self.is_fitted = False
         
+        # Incremented whenever the models change, so caches can invalidate
+        self.model_version = 0
+        
+        # Trees ever grown by the yield model, used to give each incremental
+        # update its own seeds
+        self.trees_grown = 0
+        
     def prepare_features(self, data):
         """
         Prepare features for ML model
         """
-        features = []
-        for _, row in data.iterrows():
-            planting_date = pd.to_datetime(row['planting_date'])
-            harvest_date = pd.to_datetime(row['harvest_date'])
-            
-            # Extract temporal features
-            planting_month = planting_date.month
-            planting_day_of_year = planting_date.dayofyear
-            growth_period = (harvest_date - planting_date).days
-            
-            # Weather and soil features
-            feature_vector = [
-                row['rainfall'],
-                row['temperature'],
-                row['soil_ph'],
-                row['humidity'],
-                row['soil_nitrogen'],
-                row['soil_phosphorus'],
-                row['soil_potassium'],
-                planting_month,
-                planting_day_of_year,
-                growth_period,
-                len(row.get('pesticides', [])),
-                len(row.get('diseases', []))
-            ]
-            
-            features.append(feature_vector)
-            
-        return np.array(features)
+        planting_date = pd.to_datetime(data['planting_date'])
+        harvest_date = pd.to_datetime(data['harvest_date'])
+        
+        def list_count(column):
+            if column not in data:
+                return np.zeros(len(data))
+            return data[column].map(len).to_numpy()
+        
+        # Weather and soil features, then temporal and treatment features
+        return np.column_stack([
+            data['rainfall'],
+            data['temperature'],
+            data['soil_ph'],
+            data['humidity'],
+            data['soil_nitrogen'],
+            data['soil_phosphorus'],
+            data['soil_potassium'],
+            planting_date.dt.month,
+            planting_date.dt.dayofyear,
+            (harvest_date - planting_date).dt.days,
+            list_count('pesticides'),
+            list_count('diseases')
+        ]).astype(float)
     
     def train_yield_model(self, training_data):
         """
@@ -81,6 +128,8 @@ class KenyanCropYieldPredictor:
         
         # Train model
         self.yield_model.fit(X_train_scaled, y_train)
+        self.trees_grown = len(self.yield_model.estimators_)
+        self.model_version += 1
         
         # Evaluate
         train_predictions = self.yield_model.predict(X_train_scaled)
@@ -114,17 +163,99 @@ class KenyanCropYieldPredictor:
             'feature_importance': importance_df
         }
     
-    def train_disease_model(self, training_data):
+    def update_yield_model(self, new_season_data, n_new_trees=25, max_trees=None,
+                           history_data=None):
         """
-        Train the disease risk classification model
+        Incrementally update the yield model with a new season of data.
+        New trees are fitted on the new season only (warm start); the scaler
+        is kept fixed so existing trees keep splitting on the same scale.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be trained before it can be updated")
+
+        print("Updating crop yield prediction model with new season data...")
+
+        X = self.prepare_features(new_season_data)
+        y = new_season_data['yield'].values
+
+        # Hold out part of the new season to measure the update
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+
+        previous_r2 = r2_score(
+            y_test, self.yield_model.predict(self.scaler.transform(X_test))
+        )
+
+        # Retire the oldest trees so the forest stays within max_trees
+        n_retired = 0
+        if max_trees is not None:
+            n_retired = max(len(self.yield_model.estimators_) + n_new_trees - max_trees, 0)
+            n_retired = min(n_retired, len(self.yield_model.estimators_))
+            self.yield_model.estimators_ = self.yield_model.estimators_[n_retired:]
+
+        # Grow the new trees on the new season only. Warm start draws seeds
+        # after skipping len(estimators_) values, which after retirement
+        # would repeat the seeds of kept trees, so offset the seed by the
+        # number of trees ever grown
+        base_seed = self.yield_model.random_state
+        update_seed = base_seed
+        if isinstance(base_seed, (int, np.integer)):
+            update_seed = int(base_seed) + self.trees_grown
+        self.yield_model.set_params(
+            warm_start=True,
+            n_estimators=len(self.yield_model.estimators_) + n_new_trees,
+            random_state=update_seed
+        )
+        self.yield_model.fit(self.scaler.transform(X_train), y_train)
+        self.yield_model.set_params(warm_start=False, random_state=base_seed)
+        self.trees_grown += n_new_trees
+        self.model_version += 1
+
+        updated_r2 = r2_score(
+            y_test, self.yield_model.predict(self.scaler.transform(X_test))
+        )
+
+        print(f"R² on new season before update: {previous_r2:.4f}")
+        print(f"R² on new season after update: {updated_r2:.4f}")
+        print(f"Trees added: {n_new_trees}, trees retired: {n_retired}")
+
+        results = {
+            'previous_r2': previous_r2,
+            'updated_r2': updated_r2,
+            'n_trees': len(self.yield_model.estimators_),
+            'n_new_trees': n_new_trees,
+            'n_retired_trees': n_retired
+        }
+
+        if history_data is not None:
+            # Full retrain on history plus the new season, same holdout
+            X_full = np.vstack([self.prepare_features(history_data), X_train])
+            y_full = np.concatenate([history_data['yield'].values, y_train])
+
+            full_scaler = StandardScaler()
+            full_model = clone(self.yield_model).set_params(
+                n_estimators=len(self.yield_model.estimators_)
+            )
+            full_model.fit(full_scaler.fit_transform(X_full), y_full)
+            full_r2 = r2_score(y_test, full_model.predict(full_scaler.transform(X_test)))
+
+            print(f"R² on new season with full retrain: {full_r2:.4f}")
+            print(f"Accuracy drift vs full retrain: {full_r2 - updated_r2:+.4f}")
+
+            results['full_retrain_r2'] = full_r2
+            results['accuracy_drift'] = full_r2 - updated_r2
+
+        return results
+
+    def prepare_disease_features(self, data):
+        """
+        Prepare environmental features and risk labels for the disease model
         """
-        print("\nTraining disease risk classification model...")
-        
-        # Prepare disease risk features
         disease_features = []
         disease_labels = []
         
-        for _, row in training_data.iterrows():
+        for _, row in data.iterrows():
             # Environmental features for disease prediction
             feature_vector = [
                 row['humidity'],
@@ -146,12 +277,20 @@ class KenyanCropYieldPredictor:
             disease_features.append(feature_vector)
             disease_labels.append(risk_level)
         
-        X = np.array(disease_features)
-        y = np.array(disease_labels)
+        return np.array(disease_features), np.array(disease_labels)
+
+    def train_disease_model(self, training_data):
+        """
+        Train the disease risk classification model
+        """
+        print("\nTraining disease risk classification model...")
+        
+        # Prepare disease risk features
+        X, y = self.prepare_disease_features(training_data)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
+            X, y, test_size=0.2, random_state=42, stratify=_risk_stratify(y)
         )
         
         # Train model
@@ -165,12 +304,71 @@ class KenyanCropYieldPredictor:
         print(f"Disease Model Testing Accuracy: {test_accuracy:.4f}")
         
         self.is_fitted = True
+        self.model_version += 1
         
         return {
             'train_accuracy': train_accuracy,
             'test_accuracy': test_accuracy
         }
     
+    def search_hyperparameters(self, training_data, yield_grid=None, disease_grid=None,
+                               n_jobs=None, factor=3,
+                               results_path='hyperparameter_search_results.csv'):
+        """
+        Search yield and disease model hyperparameters with successive halving.
+        Candidates are evaluated on a process pool; the feature matrices are
+        written once to float32 .npy files (the dtype sklearn trees fit on)
+        and every worker memory-maps the same copy instead of converting its
+        own. n_jobs follows the sklearn convention (-1 = all cores).
+        The predictor itself is left unchanged; the result includes a new,
+        untrained predictor configured with the best parameters.
+        """
+        print("Searching model hyperparameters...")
+
+        yield_candidates = list(ParameterGrid(yield_grid or YIELD_PARAM_GRID))
+        disease_candidates = list(ParameterGrid(disease_grid or DISEASE_PARAM_GRID))
+
+        X = self.prepare_features(training_data)
+        y = training_data['yield'].values
+        X_disease, y_disease = self.prepare_disease_features(training_data)
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            # Same splits as train_yield_model and train_disease_model
+            X_train, X_val, y_train, y_val = train_test_split(
+                X, y, test_size=0.2, random_state=42
+            )
+            scaler = StandardScaler()
+            _save_search_arrays(data_dir, 'yield', scaler.fit_transform(X_train),
+                                scaler.transform(X_val), y_train, y_val)
+
+            X_train, X_val, y_train, y_val = train_test_split(
+                X_disease, y_disease, test_size=0.2, random_state=42,
+                stratify=_risk_stratify(y_disease)
+            )
+            _save_search_arrays(data_dir, 'disease', X_train, X_val, y_train, y_val)
+
+            with ProcessPoolExecutor(max_workers=_resolve_n_jobs(n_jobs)) as pool:
+                yield_rows, best_yield = _successive_halving(
+                    pool, data_dir, 'yield', yield_candidates, factor
+                )
+                disease_rows, best_disease = _successive_halving(
+                    pool, data_dir, 'disease', disease_candidates, factor
+                )
+
+        results = pd.DataFrame(yield_rows + disease_rows)
+        results.to_csv(results_path, index=False)
+
+        print(f"Best yield model params: {best_yield}")
+        print(f"Best disease model params: {best_disease}")
+        print(f"Search results written to {results_path}")
+
+        return {
+            'results': results,
+            'best_yield_params': best_yield,
+            'best_disease_params': best_disease,
+            'predictor': KenyanCropYieldPredictor(best_yield, best_disease)
+        }
+
     def predict_yield(self, crop_data):
         """
         Predict crop yield for given conditions
@@ -195,6 +393,55 @@ class KenyanCropYieldPredictor:
             'confidence': min(confidence, 0.99)
         }
     
+    def simulate_yield_scenarios(self, farms, scenario='baseline', n_samples=1000,
+                                 quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                                 max_batch_rows=500_000, seed=42):
+        """
+        Monte Carlo yield distribution per farm under a what-if scenario.
+        Each farm's weather and soil features are perturbed n_samples times
+        (value * scale + shift + noise) and all samples for a chunk of farms
+        are scored in one scaler and forest pass; at most max_batch_rows
+        samples are held in memory at once.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be trained before prediction")
+        
+        if isinstance(scenario, str):
+            scenario = YIELD_SCENARIOS[scenario]
+        rng = np.random.default_rng(seed)
+        farms_per_batch = max(max_batch_rows // n_samples, 1)
+        
+        results = []
+        for start in range(0, len(farms), farms_per_batch):
+            batch = farms.iloc[start:start + farms_per_batch]
+            base = self.prepare_features(batch)
+            
+            # (farms, samples, features) block of perturbed inputs
+            samples = np.repeat(base, n_samples, axis=0).reshape(len(batch), n_samples, -1)
+            for feature, (column, (lower, upper), noise_std) in SCENARIO_FEATURES.items():
+                change = scenario.get(feature, {})
+                values = samples[:, :, column] * change.get('scale', 1.0) + change.get('shift', 0.0)
+                std = np.hypot(noise_std, change.get('std', 0.0))
+                values += rng.normal(0.0, std, values.shape)
+                # NumPy < 2.1 rejects np.clip with neither bound
+                if lower is not None or upper is not None:
+                    values = np.clip(values, lower, upper)
+                samples[:, :, column] = values
+            
+            predictions = self.yield_model.predict(
+                self.scaler.transform(samples.reshape(len(batch) * n_samples, -1))
+            ).reshape(len(batch), n_samples)
+            
+            summary = pd.DataFrame({
+                'mean_yield': predictions.mean(axis=1),
+                'std_yield': predictions.std(axis=1)
+            }, index=batch.index)
+            for q, values in zip(quantiles, np.quantile(predictions, quantiles, axis=1)):
+                summary[f'q{int(round(q * 100)):02d}'] = values
+            results.append(summary)
+        
+        return pd.concat(results)
+    
     def predict_disease_risk(self, environmental_data):
         """
         Predict disease risk based on environmental conditions
@@ -223,6 +470,141 @@ class KenyanCropYieldPredictor:
             'confidence': max(risk_probabilities)
         }
     
+    def predict_yield_batch(self, data):
+        """
+        Predict crop yield for every row of a DataFrame in one pass
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be trained before prediction")
+        
+        features_scaled = self.scaler.transform(self.prepare_features(data))
+        
+        # Same confidence as predict_yield, from the spread across trees
+        tree_predictions = np.stack([
+            tree.predict(features_scaled) for tree in self.yield_model.estimators_
+        ])
+        confidence = 1.0 / (1.0 + tree_predictions.std(axis=0))
+        
+        return pd.DataFrame({
+            'predicted_yield': tree_predictions.mean(axis=0),
+            'confidence': np.minimum(confidence, 0.99)
+        }, index=data.index)
+    
+    def predict_disease_risk_batch(self, data):
+        """
+        Predict disease risk for every row of a DataFrame in one pass
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be trained before prediction")
+        
+        soil_moisture = data['soil_moisture'] if 'soil_moisture' in data else 50
+        features = np.column_stack([
+            data['humidity'],
+            data['temperature'],
+            data['rainfall'],
+            data['soil_ph'],
+            np.broadcast_to(soil_moisture, len(data))
+        ]).astype(float)
+        
+        probabilities = self.disease_model.predict_proba(features)
+        classes = self.disease_model.classes_
+        
+        results = pd.DataFrame({
+            'risk_level': classes[probabilities.argmax(axis=1)],
+            'confidence': probabilities.max(axis=1)
+        }, index=data.index)
+        for i, risk_class in enumerate(classes):
+            results[f'probability_{risk_class}'] = probabilities[:, i]
+        return results
+    
+    def predict_disease_risk_raster(self, humidity, temperature, rainfall, soil_ph,
+                                    output_dir, soil_moisture=None, tile_size=512,
+                                    n_jobs=None):
+        """
+        Predict disease risk for every cell of gridded weather and soil inputs.
+        Inputs are 2D arrays or .npy paths (memory-mapped, so grids may be
+        larger than RAM). Tiles are scored on a thread pool and written to
+        risk_class.npy (index into classes, 255 = no data) and
+        risk_probability.npy (one band per class) in output_dir. n_jobs
+        defaults to all cores; -1 also means all cores, as in sklearn.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be trained before prediction")
+        
+        grids = [
+            np.load(grid, mmap_mode='r') if isinstance(grid, str) else grid
+            for grid in (humidity, temperature, rainfall, soil_ph, soil_moisture)
+        ]
+        shape = grids[0].shape
+        if any(grid is not None and grid.shape != shape for grid in grids):
+            raise ValueError("All input grids must have the same shape")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        classes = [str(c) for c in self.disease_model.classes_]
+        risk_class = np.lib.format.open_memmap(
+            os.path.join(output_dir, 'risk_class.npy'), mode='w+', dtype=np.uint8, shape=shape
+        )
+        risk_probability = np.lib.format.open_memmap(
+            os.path.join(output_dir, 'risk_probability.npy'), mode='w+',
+            dtype=np.float32, shape=(len(classes),) + shape
+        )
+        with open(os.path.join(output_dir, 'risk_classes.json'), 'w') as f:
+            json.dump(classes, f)
+        
+        tiles = [
+            (slice(row, row + tile_size), slice(col, col + tile_size))
+            for row in range(0, shape[0], tile_size)
+            for col in range(0, shape[1], tile_size)
+        ]
+        
+        # Tree inference releases the GIL, so threads score tiles in parallel
+        # while sharing the memory-mapped inputs and outputs
+        def score_tile(tile):
+            self._score_risk_tile(grids, tile, risk_class, risk_probability)
+        
+        with ThreadPoolExecutor(max_workers=_resolve_n_jobs(n_jobs) or os.cpu_count()) as pool:
+            list(pool.map(score_tile, tiles))
+        
+        risk_class.flush()
+        risk_probability.flush()
+        print(f"Scored {shape[0] * shape[1]} grid cells in {len(tiles)} tiles to {output_dir}")
+        
+        return {
+            'risk_class_path': os.path.join(output_dir, 'risk_class.npy'),
+            'risk_probability_path': os.path.join(output_dir, 'risk_probability.npy'),
+            'classes': classes
+        }
+    
+    def _score_risk_tile(self, grids, tile, risk_class, risk_probability):
+        """
+        Score one tile of the disease risk raster
+        """
+        humidity, temperature, rainfall, soil_ph, soil_moisture = [
+            None if grid is None else np.asarray(grid[tile], dtype=np.float32)
+            for grid in grids
+        ]
+        if soil_moisture is None:
+            soil_moisture = np.full_like(humidity, 50)  # Default if not available
+        
+        # Same feature order as predict_disease_risk
+        features = np.stack(
+            [humidity, temperature, rainfall, soil_ph, soil_moisture], axis=-1
+        ).reshape(-1, 5)
+        valid = ~np.isnan(features).any(axis=1)
+        
+        classes = np.full(len(features), 255, dtype=np.uint8)
+        probabilities = np.full((len(features), len(self.disease_model.classes_)), np.nan,
+                                dtype=np.float32)
+        if valid.any():
+            probabilities[valid] = self.disease_model.predict_proba(features[valid])
+            classes[valid] = probabilities[valid].argmax(axis=1)
+        
+        tile_shape = humidity.shape
+        risk_class[tile] = classes.reshape(tile_shape)
+        risk_probability[(slice(None),) + tile] = np.moveaxis(
+            probabilities.reshape(tile_shape + (-1,)), -1, 0
+        )
+    
     def save_model(self, filepath):
         """
         Save trained model to disk
@@ -231,7 +613,8 @@ class KenyanCropYieldPredictor:
             'scaler': self.scaler,
             'yield_model': self.yield_model,
             'disease_model': self.disease_model,
-            'is_fitted': self.is_fitted
+            'is_fitted': self.is_fitted,
+            'trees_grown': self.trees_grown
         }
         joblib.dump(model_data, filepath)
         print(f"Model saved to {filepath}")
@@ -245,8 +628,112 @@ class KenyanCropYieldPredictor:
         self.yield_model = model_data['yield_model']
         self.disease_model = model_data['disease_model']
         self.is_fitted = model_data['is_fitted']
+        self.trees_grown = model_data.get(
+            'trees_grown', len(getattr(self.yield_model, 'estimators_', []))
+        )
+        self.model_version += 1
         print(f"Model loaded from {filepath}")
 
+def _risk_stratify(labels):
+    """
+    Labels to stratify a disease risk split on, or None if some risk level
+    has fewer than two rows (as in small shards)
+    """
+    _, class_counts = np.unique(labels, return_counts=True)
+    return labels if class_counts.min() >= 2 else None
+
+def _resolve_n_jobs(n_jobs):
+    """
+    Worker count for an n_jobs setting as in sklearn/joblib: None keeps the
+    pool default, -1 means all cores, -2 all but one, and so on
+    """
+    if n_jobs is None:
+        return None
+    if n_jobs == 0:
+        raise ValueError("n_jobs == 0 has no meaning; use a positive count or -1 for all cores")
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return n_jobs
+
+def _save_search_arrays(data_dir, model_name, X_train, X_val, y_train, y_val):
+    """
+    Write one model's train/validation split for memory-mapped access.
+    Features are stored as C-contiguous float32 so tree fitting and
+    prediction use the mapped pages directly rather than a float32 copy.
+    """
+    arrays = {
+        'X_train': np.ascontiguousarray(X_train, dtype=np.float32),
+        'X_val': np.ascontiguousarray(X_val, dtype=np.float32),
+        'y_train': y_train,
+        'y_val': y_val
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(data_dir, f'{model_name}_{name}.npy'), array)
+
+def _load_search_arrays(data_dir, model_name):
+    """
+    Memory-map one model's train/validation split
+    """
+    return [
+        np.load(os.path.join(data_dir, f'{model_name}_{name}.npy'), mmap_mode='r')
+        for name in ('X_train', 'X_val', 'y_train', 'y_val')
+    ]
+
+def _evaluate_candidate(task):
+    """
+    Fit and score one candidate configuration (runs in a worker process)
+    """
+    data_dir, model_name, params, n_samples = task
+    X_train, X_val, y_train, y_val = _load_search_arrays(data_dir, model_name)
+
+    if model_name == 'yield':
+        model = RandomForestRegressor(**{**DEFAULT_YIELD_PARAMS, **params})
+        score_fn = r2_score
+    else:
+        model = DecisionTreeClassifier(**{**DEFAULT_DISEASE_PARAMS, **params})
+        score_fn = accuracy_score
+
+    # The training split is already shuffled, so a prefix is a random subsample
+    start = time.perf_counter()
+    model.fit(X_train[:n_samples], y_train[:n_samples])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(X_val)
+    predict_time = time.perf_counter() - start
+
+    return {
+        'model': model_name,
+        'params': params,
+        'n_samples': n_samples,
+        'score': score_fn(y_val, predictions),
+        'fit_time_s': fit_time,
+        'predict_latency_us': predict_time / len(X_val) * 1e6,
+        'model_size_bytes': len(pickle.dumps(model))
+    }
+
+def _successive_halving(pool, data_dir, model_name, candidates, factor):
+    """
+    Keep the best 1/factor of candidates each round while growing the
+    training sample by factor, so only the finalists see all the data
+    """
+    n_train = len(_load_search_arrays(data_dir, model_name)[2])
+    n_rounds = max(int(np.ceil(np.log(len(candidates)) / np.log(factor))), 1)
+
+    rows = []
+    for round_idx in range(n_rounds):
+        n_samples = max(n_train // factor ** (n_rounds - 1 - round_idx), 1)
+        tasks = [(data_dir, model_name, params, n_samples) for params in candidates]
+        round_rows = list(pool.map(_evaluate_candidate, tasks))
+        for row in round_rows:
+            row['round'] = round_idx
+        rows.extend(round_rows)
+
+        ranked = sorted(round_rows, key=lambda row: row['score'], reverse=True)
+        candidates = [row['params'] for row in ranked[:int(np.ceil(len(ranked) / factor))]]
+
+    return rows, candidates[0]
+
 def generate_sample_kenyan_data(n_samples=1000):
     """
     Generate sample crop data for Kenyan agriculture
@@ -338,6 +825,143 @@ def generate_sample_kenyan_data(n_samples=1000):
     
     return pd.DataFrame(data)
 
+# Per-crop (base_yield, rainfall mean, rainfall std, temperature mean, temperature std),
+# matching generate_sample_kenyan_data
+CROP_PROFILES = {
+    'Maize': (40, 800, 150, 25, 4),
+    'Coffee': (15, 1200, 200, 20, 3),
+    'Tea': (25, 1500, 300, 18, 2),
+    'Beans': (20, 700, 200, 24, 3),
+    'Potatoes': (20, 700, 200, 24, 3),
+    'Tomatoes': (20, 700, 200, 24, 3),
+    'Cassava': (20, 700, 200, 24, 3)
+}
+KENYAN_REGIONS = ['Central', 'Eastern', 'Western', 'Rift Valley', 'Coast', 'Northern', 'Nyanza']
+
+def generate_kenyan_data_chunk(chunk_index, chunk_size, n_samples=None, seed=42):
+    """
+    Generate one chunk of sample crop data with vectorized array draws.
+    Each (seed, chunk_index) pair has its own random stream, so chunks can be
+    generated independently in parallel and are reproducible.
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    start = chunk_index * chunk_size
+    stop = start + chunk_size if n_samples is None else min(start + chunk_size, n_samples)
+    n = max(stop - start, 0)
+    
+    crops = np.array(list(CROP_PROFILES))
+    profiles = np.array(list(CROP_PROFILES.values()), dtype=float)
+    crop_idx = rng.integers(0, len(crops), n)
+    base_yield, rain_mean, rain_std, temp_mean, temp_std = profiles[crop_idx].T
+    
+    rainfall = rng.normal(rain_mean, rain_std)
+    temperature = rng.normal(temp_mean, temp_std)
+    humidity = rng.normal(70, 15, n)
+    soil_ph = rng.normal(6.2, 0.8, n)
+    soil_nitrogen = rng.normal(25, 10, n)
+    soil_phosphorus = rng.normal(20, 8, n)
+    soil_potassium = rng.normal(150, 50, n)
+    
+    # Planting dates in 2024 (day 1-27) and growth periods of 90-239 days
+    planting_month = rng.integers(1, 13, n)
+    growth_period = rng.integers(90, 240, n)
+    planting_date = (
+        (np.datetime64('2024-01') + (planting_month - 1)).astype('datetime64[D]')
+        + rng.integers(0, 27, n)
+    )
+    harvest_date = planting_date + growth_period
+    
+    # Simulate yield based on conditions
+    yield_factor = np.ones(n)
+    yield_factor *= np.where(rainfall < 500, 0.7, np.where(rainfall > 1500, 0.8, 1.0))
+    yield_factor *= np.where((temperature < 15) | (temperature > 35), 0.6, 1.0)
+    yield_factor *= np.where((soil_ph < 5.5) | (soil_ph > 7.5), 0.8, 1.0)
+    actual_yield = np.maximum(base_yield * yield_factor * rng.normal(1.0, 0.2, n), 0)
+    
+    # Simulate diseases based on environmental conditions
+    fungal = (humidity > 80) & (temperature > 20) & (rng.random(n) < 0.3)
+    root_rot = (rainfall > 1000) & (rng.random(n) < 0.2)
+    disease_codes = fungal.astype(int) + 2 * root_rot.astype(int)
+    
+    # Rows with the same outcome share one list object (treat as read-only);
+    # building a fresh list per row would dominate the generation time
+    disease_options = np.empty(4, dtype=object)
+    disease_options[:] = [[], ['Fungal infections'], ['Root rot'], ['Fungal infections', 'Root rot']]
+    pesticide_options = np.empty(2, dtype=object)
+    pesticide_options[:] = [[], ['Fungicide', 'Organic spray']]
+    
+    return pd.DataFrame({
+        'crop_id': np.char.add('crop_', np.arange(start, stop).astype(str)),
+        'crop_name': crops[crop_idx],
+        'region': np.array(KENYAN_REGIONS)[rng.integers(0, len(KENYAN_REGIONS), n)],
+        'planting_date': planting_date,
+        'harvest_date': harvest_date,
+        'yield': actual_yield,
+        'rainfall': np.maximum(rainfall, 0),
+        'temperature': temperature,
+        'humidity': np.clip(humidity, 0, 100),
+        'soil_ph': np.clip(soil_ph, 4, 9),
+        'soil_nitrogen': np.maximum(soil_nitrogen, 0),
+        'soil_phosphorus': np.maximum(soil_phosphorus, 0),
+        'soil_potassium': np.maximum(soil_potassium, 0),
+        'diseases': disease_options[disease_codes],
+        'pesticides': pesticide_options[(disease_codes > 0).astype(int)]
+    })
+
+def iter_kenyan_data_chunks(n_samples, chunk_size=100_000, seed=42):
+    """
+    Stream sample crop data as DataFrames of at most chunk_size rows
+    """
+    for chunk_index in range(-(-n_samples // chunk_size)):
+        yield generate_kenyan_data_chunk(chunk_index, chunk_size, n_samples, seed)
+
+def write_kenyan_data(filepath, n_samples, chunk_size=100_000, seed=42, n_jobs=1):
+    """
+    Write sample crop data chunk by chunk to a .parquet or .csv file.
+    With n_jobs other than 1 (sklearn convention, -1 = all cores), filepath
+    is a directory and each worker process generates and writes its own
+    part files, so no rows cross processes.
+    """
+    if n_jobs != 1:
+        os.makedirs(filepath, exist_ok=True)
+        extension = '.parquet' if filepath.endswith('.parquet') else '.csv'
+        n_chunks = -(-n_samples // chunk_size)
+        tasks = [
+            (os.path.join(filepath, f'part-{i:05d}{extension}'), i, chunk_size, n_samples, seed)
+            for i in range(n_chunks)
+        ]
+        with ProcessPoolExecutor(max_workers=_resolve_n_jobs(n_jobs)) as pool:
+            list(pool.map(_write_kenyan_data_part, tasks))
+    elif filepath.endswith('.parquet'):
+        # Optional dependency, only needed for Parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        writer = None
+        for chunk in iter_kenyan_data_chunks(n_samples, chunk_size, seed):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(filepath, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+    else:
+        for i, chunk in enumerate(iter_kenyan_data_chunks(n_samples, chunk_size, seed)):
+            chunk.to_csv(filepath, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    
+    print(f"Wrote {n_samples} crop records to {filepath}")
+
+def _write_kenyan_data_part(task):
+    """
+    Generate and write one chunk as its own file (runs in a worker process)
+    """
+    part_path, chunk_index, chunk_size, n_samples, seed = task
+    chunk = generate_kenyan_data_chunk(chunk_index, chunk_size, n_samples, seed)
+    if part_path.endswith('.parquet'):
+        chunk.to_parquet(part_path, index=False)
+    else:
+        chunk.to_csv(part_path, index=False)
+
 def main():
     """
     Main function to demonstrate the ML pipeline
@@ -168,6 +168,8 @@ class PlantDiseaseDetector:
         """
         if isinstance(image_path, str):
             img = cv2.imread(image_path)
+            if img is None:
+                raise ValueError(f"Could not read image: {image_path}")
             img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         else:
             img = np.array(image_path)
@@ -293,6 +295,58 @@ class PlantDiseaseDetector:
         
         return results
     
+    def predict_disease_batch(self, image_paths, batch_size=32):
+        """
+        Predict the top disease for many images, batching model calls.
+        Images that cannot be read get a null result with an 'error' message.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before prediction")
+        
+        results = []
+        for start in range(0, len(image_paths), batch_size):
+            batch_paths = image_paths[start:start + batch_size]
+            
+            images = []
+            batch_results = []
+            for path in batch_paths:
+                try:
+                    images.append(self.preprocess_image(path))
+                    batch_results.append(None)
+                except Exception as e:
+                    batch_results.append({
+                        'disease': None,
+                        'confidence': None,
+                        'description': None,
+                        'treatment': [],
+                        'severity': None,
+                        'error': str(e)
+                    })
+            
+            predictions = self.model.predict(np.stack(images), verbose=0) if images else []
+            
+            # Fill the successfully preprocessed slots in order
+            slots = (i for i, result in enumerate(batch_results) if result is None)
+            for slot, probs in zip(slots, predictions):
+                disease_name = self.class_names[int(np.argmax(probs))]
+                disease_info = self.disease_info.get(disease_name, {
+                    'description': 'Unknown disease',
+                    'treatment': ['Consult agricultural expert'],
+                    'severity': 'Unknown'
+                })
+                batch_results[slot] = {
+                    'disease': disease_name,
+                    'confidence': float(np.max(probs)),
+                    'description': disease_info['description'],
+                    'treatment': disease_info['treatment'],
+                    'severity': disease_info['severity'],
+                    'error': None
+                }
+            
+            results.extend(batch_results)
+        
+        return results
+    
     def evaluate_model(self, test_dataset):
         """
         Evaluate model performance
@@ -0,0 +1,209 @@
+"""
+Prediction Cache for Kenyan Agriculture Models
+Quantized-input memoization of yield and disease risk queries
+"""
+
+from collections import OrderedDict
+import copy
+import math
+import numbers
+import threading
+import time
+import pandas as pd
+
+from crop_yield_predictor import KenyanCropYieldPredictor, generate_sample_kenyan_data
+
+# Inputs are rounded to these steps before lookup and prediction, roughly
+# matching weather forecast and soil test precision
+DEFAULT_RESOLUTIONS = {
+    'rainfall': 10.0,
+    'temperature': 0.5,
+    'humidity': 1.0,
+    'soil_ph': 0.1,
+    'soil_nitrogen': 1.0,
+    'soil_phosphorus': 1.0,
+    'soil_potassium': 5.0,
+    'soil_moisture': 1.0
+}
+
+YIELD_INPUTS = ['rainfall', 'temperature', 'soil_ph', 'humidity',
+                'soil_nitrogen', 'soil_phosphorus', 'soil_potassium']
+DISEASE_INPUTS = ['humidity', 'temperature', 'rainfall', 'soil_ph', 'soil_moisture']
+
+class CachedCropYieldPredictor:
+    """
+    Memoizes predict_yield and predict_disease_risk on quantized inputs with
+    TTL and LRU eviction. The cache is cleared whenever the wrapped
+    predictor's models change (load_model or retraining).
+    """
+
+    def __init__(self, predictor, resolutions=None, ttl=300.0, max_entries=10000):
+        self.predictor = predictor
+        self.resolutions = {**DEFAULT_RESOLUTIONS, **(resolutions or {})}
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.entries = OrderedDict()
+        self.model_version = predictor.model_version
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.miss_time = 0.0
+        self.hit_time = 0.0
+
+    def cacheable(self, data, inputs):
+        """
+        Whether every input present is a finite number that can be quantized
+        """
+        return all(
+            isinstance(data[name], numbers.Real) and math.isfinite(data[name])
+            for name in inputs if name in data
+        )
+
+    def quantize(self, data, inputs):
+        """
+        Copy of data with numeric inputs rounded to their resolutions
+        """
+        quantized = dict(data)
+        for name in inputs:
+            if name in quantized:
+                step = self.resolutions[name]
+                quantized[name] = round(round(quantized[name] / step) * step, 6)
+        return quantized
+
+    def predict_yield(self, crop_data):
+        """
+        Cached predict_yield; only the inputs the model uses form the key
+        """
+        if not self.cacheable(crop_data, YIELD_INPUTS):
+            return self._bypass(self.predictor.predict_yield, crop_data)
+        quantized = self.quantize(crop_data, YIELD_INPUTS)
+        key = ('yield',) + tuple(quantized[name] for name in YIELD_INPUTS) + (
+            str(pd.to_datetime(quantized['planting_date']).date()),
+            str(pd.to_datetime(quantized['harvest_date']).date()),
+            len(quantized.get('pesticides', [])),
+            len(quantized.get('diseases', []))
+        )
+        return self._cached(key, self.predictor.predict_yield, quantized)
+
+    def predict_disease_risk(self, environmental_data):
+        """
+        Cached predict_disease_risk
+        """
+        if not self.cacheable(environmental_data, DISEASE_INPUTS):
+            return self._bypass(self.predictor.predict_disease_risk, environmental_data)
+        quantized = self.quantize(environmental_data, DISEASE_INPUTS)
+        key = ('disease',) + tuple(quantized.get(name) for name in DISEASE_INPUTS)
+        return self._cached(key, self.predictor.predict_disease_risk, quantized)
+
+    def load_model(self, filepath):
+        """
+        Load a model into the wrapped predictor and clear the cache
+        """
+        self.predictor.load_model(filepath)
+        self.clear()
+
+    def clear(self):
+        """
+        Drop all cached results
+        """
+        with self.lock:
+            self.entries.clear()
+            self.model_version = self.predictor.model_version
+
+    def stats(self):
+        """
+        Hit rate and estimated latency saved by the cache
+        """
+        lookups = self.hits + self.misses
+        avg_miss = self.miss_time / self.misses if self.misses else 0.0
+        avg_hit = self.hit_time / self.hits if self.hits else 0.0
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'avg_miss_ms': avg_miss * 1000,
+            'avg_hit_ms': avg_hit * 1000,
+            'latency_saved_s': self.hits * (avg_miss - avg_hit)
+        }
+
+    def _bypass(self, predict, data):
+        """
+        Predict without caching, for inputs (NaN, inf, non-numeric) that cannot
+        be quantized into a key
+        """
+        with self.lock:
+            self.bypassed += 1
+        return predict(data)
+
+    def _cached(self, key, predict, data):
+        """
+        Look up key, computing and storing predict(data) on a miss
+        """
+        start = time.perf_counter()
+        now = time.monotonic()
+
+        with self.lock:
+            if self.predictor.model_version != self.model_version:
+                self.entries.clear()
+                self.model_version = self.predictor.model_version
+
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                result = copy.deepcopy(entry[1])
+                self.hit_time += time.perf_counter() - start
+                return result
+
+            version = self.model_version
+
+        result = predict(data)
+
+        with self.lock:
+            # Don't store a result from a model replaced while predicting
+            if (self.predictor.model_version == version
+                    and self.model_version == version):
+                self.entries[key] = (now + self.ttl, result)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            self.misses += 1
+            self.miss_time += time.perf_counter() - start
+
+        return copy.deepcopy(result)
+
+def main():
+    """
+    Main function to demonstrate cached predictions
+    """
+    print("Cached Kenyan Crop Predictions")
+    print("=" * 40)
+
+    df = generate_sample_kenyan_data(1000)
+    predictor = KenyanCropYieldPredictor()
+    predictor.train_yield_model(df)
+    predictor.train_disease_model(df)
+
+    cached = CachedCropYieldPredictor(predictor, ttl=60)
+
+    # Dashboard-style traffic: the same farms with slightly different weather
+    for _, row in df.head(50).iterrows():
+        for offset in (0.0, 0.1, -0.1, 0.2):
+            crop = row.to_dict()
+            crop['temperature'] += offset
+            cached.predict_yield(crop)
+            cached.predict_disease_risk(crop)
+
+    stats = cached.stats()
+    print(f"\nHit rate: {stats['hit_rate']:.2%}")
+    print(f"Average miss latency: {stats['avg_miss_ms']:.2f} ms")
+    print(f"Average hit latency: {stats['avg_hit_ms']:.3f} ms")
+    print(f"Latency saved: {stats['latency_saved_s']:.2f} s")
+
+if __name__ == "__main__":
+    main()
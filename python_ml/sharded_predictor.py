@@ -0,0 +1,185 @@
+"""
+Sharded Crop Yield Prediction for Kenyan Agriculture
+One sub-model per crop and region, loaded lazily with LRU residency
+"""
+
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import threading
+
+from crop_yield_predictor import (KenyanCropYieldPredictor, generate_sample_kenyan_data,
+                                  _resolve_n_jobs)
+
+GLOBAL_SHARD = '__global__'
+
+class ShardedCropYieldPredictor:
+    """
+    Routes yield and disease risk predictions to per crop/region sub-models
+    """
+    
+    def __init__(self, model_dir, shard_by=('crop_name', 'region'), max_resident=8,
+                 min_shard_samples=30, yield_params=None, disease_params=None):
+        self.model_dir = model_dir
+        self.shard_by = list(shard_by)
+        self.max_resident = max_resident
+        self.min_shard_samples = min_shard_samples
+        self.yield_params = yield_params
+        self.disease_params = disease_params
+        
+        # Shard name -> metadata, and the loaded shards in LRU order
+        self.manifest = {}
+        self.resident = OrderedDict()
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        
+        manifest_path = os.path.join(model_dir, 'shards.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+    
+    def shard_name(self, record):
+        """
+        Shard name for a record, e.g. 'Maize__Rift_Valley'
+        """
+        values = [str(record[column]).replace(' ', '_') for column in self.shard_by]
+        return '__'.join(values)
+    
+    def train(self, training_data, n_jobs=None):
+        """
+        Train one sub-model per shard in parallel, plus a global fallback
+        model for shards with fewer than min_shard_samples records.
+        n_jobs follows the sklearn convention (-1 = all cores).
+        """
+        print("Training sharded crop models...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        
+        tasks = [(GLOBAL_SHARD, training_data)]
+        for _, shard_data in training_data.groupby(self.shard_by):
+            if len(shard_data) >= self.min_shard_samples:
+                tasks.append((self.shard_name(shard_data.iloc[0]), shard_data))
+        
+        with ProcessPoolExecutor(max_workers=_resolve_n_jobs(n_jobs)) as pool:
+            results = list(pool.map(
+                _train_shard,
+                [(name, data, self.model_dir, self.yield_params, self.disease_params)
+                 for name, data in tasks]
+            ))
+        
+        self.manifest = {result['shard']: result for result in results}
+        with open(os.path.join(self.model_dir, 'shards.json'), 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        
+        # Drop stale shards from a previous training run
+        with self.lock:
+            self.resident.clear()
+        
+        print(f"Trained {len(self.manifest) - 1} shards plus global fallback")
+        return pd.DataFrame(results)
+    
+    def get_shard(self, record):
+        """
+        Return the sub-model for a record, loading it from disk if needed
+        """
+        name = self.shard_name(record) if all(c in record for c in self.shard_by) else None
+        if name not in self.manifest:
+            name = GLOBAL_SHARD
+        if name not in self.manifest:
+            raise ValueError("Model must be trained before prediction")
+        
+        # Loads happen under the lock too, so concurrent requests never load
+        # the same shard twice or evict one that is still being loaded
+        with self.lock:
+            if name in self.resident:
+                self.resident.move_to_end(name)
+                return self.resident[name]
+            
+            shard = KenyanCropYieldPredictor()
+            with redirect_stdout(io.StringIO()):
+                shard.load_model(os.path.join(self.model_dir, self.manifest[name]['file']))
+            self.loads += 1
+            
+            self.resident[name] = shard
+            if len(self.resident) > self.max_resident:
+                self.resident.popitem(last=False)
+                self.evictions += 1
+        
+        return shard
+    
+    def predict_yield(self, crop_data):
+        """
+        Predict crop yield using the crop/region shard
+        """
+        return self.get_shard(crop_data).predict_yield(crop_data)
+    
+    def predict_disease_risk(self, environmental_data):
+        """
+        Predict disease risk using the crop/region shard
+        """
+        return self.get_shard(environmental_data).predict_disease_risk(environmental_data)
+
+def _train_shard(task):
+    """
+    Train and save one shard (runs in a worker process)
+    """
+    name, shard_data, model_dir, yield_params, disease_params = task
+    predictor = KenyanCropYieldPredictor(yield_params, disease_params)
+    
+    # Silence per-model training output from the workers
+    with redirect_stdout(io.StringIO()):
+        yield_results = predictor.train_yield_model(shard_data)
+        disease_results = predictor.train_disease_model(shard_data)
+        filename = f'{name}.joblib'
+        predictor.save_model(os.path.join(model_dir, filename))
+    
+    return {
+        'shard': name,
+        'file': filename,
+        'n_samples': len(shard_data),
+        'test_r2': yield_results['test_r2'],
+        'test_accuracy': disease_results['test_accuracy']
+    }
+
+def main():
+    """
+    Main function to demonstrate the sharded pipeline
+    """
+    print("Sharded Kenyan Crop Model Pipeline")
+    print("=" * 40)
+    
+    df = generate_sample_kenyan_data(10000)
+    
+    sharded = ShardedCropYieldPredictor('kenyan_crop_shards', max_resident=8)
+    shard_results = sharded.train(df)
+    print(shard_results[['shard', 'n_samples', 'test_r2', 'test_accuracy']])
+    
+    example_crop = {
+        'crop_name': 'Coffee',
+        'region': 'Central',
+        'rainfall': 1200,
+        'temperature': 20,
+        'soil_ph': 6.2,
+        'humidity': 75,
+        'soil_nitrogen': 25,
+        'soil_phosphorus': 20,
+        'soil_potassium': 150,
+        'planting_date': '2024-03-15',
+        'harvest_date': '2024-08-15',
+        'pesticides': [],
+        'diseases': []
+    }
+    
+    yield_prediction = sharded.predict_yield(example_crop)
+    print(f"\nCoffee / Central Predicted Yield: {yield_prediction['predicted_yield']:.2f} tons/hectare")
+    
+    disease_prediction = sharded.predict_disease_risk(example_crop)
+    print(f"Coffee / Central Disease Risk Level: {disease_prediction['risk_level']}")
+    print(f"Shard loads: {sharded.loads}, evictions: {sharded.evictions}")
+
+if __name__ == "__main__":
+    main()